@@ -0,0 +1,47 @@
+"""
+Pure-Python pixel kernels shared by the Numba JIT path in
+image_processing.py and the precompiled module built by build_kernels.py.
+
+Keeping a single body here means both compiled versions always agree.
+The loops also run as plain Python, just slowly.
+"""
+import numpy as np
+
+try:
+    # Parallel loop under numba.njit(parallel=True), a plain range otherwise
+    from numba import prange
+except ImportError:  # Numba is optional, the kernels are then plain Python
+    prange = range
+
+
+def threshold(img, threshold_value, out):
+    """
+    Threshold a flattened uint8 image into out.
+
+    Args:
+        img: Flattened uint8 image
+        threshold_value: Pixel values below this become 0, the rest become 255
+        out: uint8 array with the same length as img, filled in place
+    """
+    for i in range(img.shape[0]):
+        out[i] = 255 if img[i] >= threshold_value else 0
+
+
+def red_mask(img, scale, out):
+    """
+    Write the redness detection result for every pixel in one sweep.
+
+    Args:
+        img: uint8 RGB image of shape (height, width, 3)
+        scale: Sensitivity in 8.8 fixed point (see _sensitivity_scale)
+        out: uint8 array with the same shape as img, filled in place
+    """
+    height, width = img.shape[0], img.shape[1]
+    for i in prange(height):
+        for j in range(width):
+            r = np.int64(img[i, j, 0]) * 256
+            g, b = np.int64(img[i, j, 1]), np.int64(img[i, j, 2])
+            value = 255 if (r > g * scale and r > b * scale) else 0
+            out[i, j, 0] = value
+            out[i, j, 1] = value
+            out[i, j, 2] = value
@@ -0,0 +1,29 @@
+"""
+Build the ahead-of-time compiled pixel kernels used by image_processing.py.
+
+Run once with Numba installed:
+
+    python src/build_kernels.py
+
+This writes an 'img_kernels' extension module next to this file. The
+kernel bodies live in _kernels.py, so rebuild after changing them.
+image_processing.py uses the precompiled thresholding kernel
+automatically. It uses the precompiled redness kernel only when Numba
+itself is not importable, because the JIT version runs multi-threaded.
+"""
+import os
+
+from numba.pycc import CC
+
+import _kernels
+
+cc = CC('img_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc.export('threshold_u8', 'void(u1[::1], f8, u1[::1])')(_kernels.threshold)
+cc.export('red_mask_u8', 'void(u1[:, :, ::1], i8, u1[:, :, ::1])')(_kernels.red_mask)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"Kernels built in: {cc.output_dir}")
@@ -2,11 +2,410 @@ import matplotlib.pyplot as plt
 from typing import TypeVar
 import numpy as np
 import matplotlib.image as mpimg
-import imageio as im
+import imageio.v3 as iio
+import cv2
+import atexit
+import concurrent.futures
+import io
 import os
+import threading
+
+try:
+    import numba
+except ImportError:  # Numba is optional, plain NumPy is used without it
+    numba = None
+
+# Sibling modules in src/, found both as 'src.image_processing' and when run from src/
+try:
+    from . import _kernels
+except ImportError:
+    import _kernels
+
+try:
+    # Precompiled kernels, built with 'python src/build_kernels.py'
+    try:
+        from .img_kernels import threshold_u8, red_mask_u8
+    except ImportError:
+        from img_kernels import threshold_u8, red_mask_u8
+except ImportError:  # Not built, the Numba JIT or NumPy paths are used instead
+    threshold_u8 = red_mask_u8 = None
+
+try:
+    import lz4.frame
+except ImportError:  # lz4 is optional, images are always decoded without it
+    lz4 = None
 
 chooseReturn = TypeVar('T')
 
+# Images live in the assets folder next to src/, created once at import
+_ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets')
+os.makedirs(_ASSETS_DIR, exist_ok=True)
+
+# Background pool for PNG encoding, so saving overlaps with further processing
+_WRITE_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count())
+atexit.register(_WRITE_POOL.shutdown, wait=True)
+
+# Writes that have been submitted but not finished yet, by file path.
+# Guarded by _pending_lock, since pool threads remove finished entries.
+_pending_writes = {}
+_pending_lock = threading.Lock()
+
+# Version of the pixel cache format, bumped whenever decoding changes
+_CACHE_VERSION = 2
+
+# Pixels per tile for the NumPy redness path, so a tile and its
+# temporaries (about 16 bytes per pixel) stay within a typical L2 cache
+_TILE_PIXELS = 64 * 1024
+
+
+if numba is not None:
+    # Redness detection for every pixel in one multi-threaded sweep
+    _red_mask_kernel = numba.njit(parallel=True, cache=True, fastmath=True)(_kernels.red_mask)
+else:
+    _red_mask_kernel = None
+
+
+def _sensitivity_scale(sensitivity: float, max_value: int = 255) -> int:
+    """
+    Convert a sensitivity factor to 8.8 fixed point.
+
+    Comparing red * 256 > green * scale keeps the redness test in
+    integer arithmetic instead of upcasting the channels to float64.
+
+    The factor is clamped to [-max_value, max_value] first. Beyond that
+    range the result no longer changes (red * 256 is at most
+    max_value * 256), and the products stay bounded.
+
+    Args:
+        sensitivity: Detection sensitivity factor
+        max_value: Largest possible channel value of the image
+
+    Returns:
+        Sensitivity multiplied by 256 and rounded to the nearest integer
+    """
+    sensitivity = min(max(sensitivity, -float(max_value)), float(max_value))
+    return int(round(sensitivity * 256))
+
+
+def _red_work_dtype(img_dtype: np.dtype) -> np.dtype:
+    """
+    Integer type wide enough for channel * scale in the redness test.
+
+    Args:
+        img_dtype: uint8 or uint16 channel type
+
+    Returns:
+        int32 for uint8 images, int64 for uint16 images
+    """
+    return np.dtype(np.int32) if img_dtype == np.uint8 else np.dtype(np.int64)
+
+
+def _threshold_into(img_array: np.ndarray, threshold_value: float, out: np.ndarray) -> None:
+    """
+    Threshold an image into a uint8 buffer (255 where img_array >= threshold_value, else 0).
+
+    Args:
+        img_array: Image to threshold
+        threshold_value: Threshold to compare against
+        out: uint8 array with the same shape as img_array, filled in place
+    """
+    if threshold_u8 is not None and img_array.dtype == np.uint8:
+        # Precompiled kernel: one pass over the pixels, no JIT warmup
+        threshold_u8(np.ascontiguousarray(img_array).reshape(-1),
+                     float(threshold_value), out.reshape(-1))
+        return
+
+    # Compare straight into the output buffer, then scale in place:
+    # True -> 255 (white), False -> 0 (black)
+    np.greater_equal(img_array, threshold_value, out=out.view(bool))
+    np.multiply(out, np.uint8(255), out=out)
+
+
+def _threshold_stack(img_array: np.ndarray, thresholds) -> np.ndarray:
+    """
+    Threshold an image against several values in one broadcast operation.
+
+    Args:
+        img_array: Image to threshold
+        thresholds: Sequence of N threshold values
+
+    Returns:
+        uint8 array of shape (N, *img_array.shape), one 0/255 image per value
+    """
+    thresholds = np.asarray(thresholds, dtype=float).reshape((-1,) + (1,) * img_array.ndim)
+    if img_array.dtype == np.uint8:
+        # For integer pixels 'p >= t' equals 'p >= ceil(t)', so compare in small ints
+        thresholds = np.clip(np.ceil(thresholds), 0, 256).astype(np.uint16)
+
+    mask = img_array[None] >= thresholds
+    return mask.view(np.uint8) * np.uint8(255)
+
+
+def _red_mask_torch(img: np.ndarray, scale: int, device: str):
+    """
+    Run the redness detection on a PyTorch device (e.g. a CUDA GPU).
+
+    Args:
+        img: uint8 or uint16 RGB image of shape (height, width, 3)
+        scale: Sensitivity in 8.8 fixed point (see _sensitivity_scale)
+        device: PyTorch device to run on
+
+    Returns:
+        uint8 RGB result image, or None if PyTorch or the device is unavailable
+    """
+    try:
+        import torch
+    except ImportError:
+        return None
+    if device == 'cuda' and not torch.cuda.is_available():
+        return None
+
+    if img.dtype != np.uint8:
+        # PyTorch has no general uint16 support, int32 holds every uint16 value
+        img = img.astype(np.int32)
+    work_dtype = torch.int32 if _red_work_dtype(img.dtype) == np.int32 else torch.int64
+    pixels = torch.from_numpy(img).to(device, non_blocking=True).to(work_dtype)
+    r, g, b = pixels.unbind(-1)
+    r = r * 256
+    mask = (r > g * scale) & (r > b * scale)
+    out = mask.to(torch.uint8).mul_(255).unsqueeze(-1).expand(-1, -1, 3).contiguous()
+    return out.cpu().numpy()
+
+
+def _byte_shuffle(array: np.ndarray) -> bytes:
+    """
+    Group the bytes of every element by significance before compression.
+
+    Multi-byte pixels (e.g. 16-bit images) compress much better this way,
+    for uint8 images this is a no-op.
+
+    Args:
+        array: Array to serialize
+
+    Returns:
+        Shuffled raw bytes of the array
+    """
+    raw = np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+    return raw.reshape(-1, array.itemsize).T.tobytes()
+
+
+def _byte_unshuffle(data: bytes, shape: tuple, dtype: np.dtype) -> np.ndarray:
+    """
+    Inverse of _byte_shuffle.
+
+    Args:
+        data: Shuffled raw bytes
+        shape: Shape of the original array
+        dtype: Data type of the original array
+
+    Returns:
+        The restored array
+    """
+    raw = np.frombuffer(data, dtype=np.uint8).reshape(dtype.itemsize, -1)
+    return raw.T.copy().view(dtype).reshape(shape)
+
+
+def _write_image(image_path: str, img_array: np.ndarray,
+                 previous: concurrent.futures.Future = None) -> None:
+    """
+    Encode and write an image to disk (runs on the write pool).
+
+    Args:
+        image_path: Full path of the file to write
+        img_array: Image data to write
+        previous: Earlier write to the same path, which must land first
+    """
+    if previous is not None:
+        concurrent.futures.wait([previous])
+    iio.imwrite(image_path, img_array, plugin="opencv")
+
+
+def _submit_write(image_path: str, img_array: np.ndarray) -> None:
+    """
+    Queue an image for writing in the background.
+
+    Args:
+        image_path: Full path of the file to write
+        img_array: Image data to write (a private copy is taken)
+    """
+    with _pending_lock:
+        previous = _pending_writes.get(image_path)
+        future = _WRITE_POOL.submit(_write_image, image_path, img_array.copy(), previous)
+        _pending_writes[image_path] = future
+
+    def _on_done(done):
+        # Runs on a pool thread, only drop the entry if no newer write replaced it
+        with _pending_lock:
+            if _pending_writes.get(image_path) is done:
+                del _pending_writes[image_path]
+        if done.exception() is not None:
+            print(f"Error: could not save {image_path}: {done.exception()}")
+
+    future.add_done_callback(_on_done)
+
+
+def _to_rgba(img_array: np.ndarray) -> np.ndarray:
+    """
+    Add an opaque alpha channel to a uint8 RGB image for display.
+
+    Matplotlib draws uint8 RGBA data as is, skipping its own RGB to RGBA
+    conversion. Other images are returned unchanged.
+
+    Args:
+        img_array: Image to display
+
+    Returns:
+        uint8 RGBA copy of an RGB image, or the image itself
+    """
+    if img_array.dtype != np.uint8 or img_array.ndim != 3 or img_array.shape[2] != 3:
+        return img_array
+
+    rgba = np.empty(img_array.shape[:2] + (4,), dtype=np.uint8)
+    rgba[:, :, :3] = img_array
+    rgba[:, :, 3] = 255
+    return rgba
+
+
+def _png_format(image_path: str):
+    """
+    Read bit depth and color type from a PNG file header.
+
+    Args:
+        image_path: Full path to the image file
+
+    Returns:
+        (bit_depth, color_type) tuple, or None if the file is not a PNG
+    """
+    with open(image_path, 'rb') as image_file:
+        header = image_file.read(26)
+    if len(header) < 26 or header[:8] != b'\x89PNG\r\n\x1a\n':
+        return None
+    return header[24], header[25]
+
+
+def _decode_image(image_path: str) -> np.ndarray:
+    """
+    Decode an image file with OpenCV into the same layout Pillow produces.
+
+    OpenCV expands gray + alpha PNGs to RGBA and keeps 16-bit color PNGs at
+    16 bit, while Pillow returns 2 channels and 8-bit color. Both are
+    converted back here, so thresholds and redness detection keep working
+    on 0-255 values. 16-bit grayscale stays 16 bit, as with Pillow.
+
+    Args:
+        image_path: Full path to the image file
+
+    Returns:
+        Numpy array representation of the image
+    """
+    img_array = iio.imread(image_path, plugin="opencv", flags=cv2.IMREAD_UNCHANGED)
+
+    png_format = _png_format(image_path)
+    if png_format is not None:
+        bit_depth, color_type = png_format
+        if color_type == 4 and img_array.ndim == 3:
+            # Gray + alpha: keep one gray channel and the alpha channel
+            img_array = img_array[:, :, [0, 3]]
+        if bit_depth == 16 and color_type != 0:
+            # 16-bit color: keep the high byte of every sample
+            img_array = (img_array >> 8).astype(np.uint8)
+    return img_array
+
+
+def _load_cache(cache_path: str, source_stat: os.stat_result):
+    """
+    Load cached pixels if the cache was written for this exact source file.
+
+    Args:
+        cache_path: Path of the '.npy.lz4' cache file
+        source_stat: os.stat result of the image file
+
+    Returns:
+        The cached image, or None if the cache is missing, stale or unreadable
+    """
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            buffer = io.BytesIO(lz4.frame.decompress(cache_file.read()))
+        version, mtime_ns, size = np.frombuffer(buffer.read(24), dtype=np.int64)
+        if version != _CACHE_VERSION or mtime_ns != source_stat.st_mtime_ns \
+                or size != source_stat.st_size:
+            return None
+        np.lib.format.read_magic(buffer)
+        shape, _, dtype = np.lib.format.read_array_header_1_0(buffer)
+        return _byte_unshuffle(buffer.read(), shape, dtype)
+    except Exception:
+        # Missing, truncated or otherwise broken cache, decode the image instead
+        return None
+
+
+def _store_cache(cache_path: str, source_stat: os.stat_result, img_array: np.ndarray) -> None:
+    """
+    Write the pixel cache for an image, tagged with the source file's stat.
+
+    The cache is written to a temporary file and moved into place, so an
+    interrupted write never leaves a broken cache behind. Failures (e.g. a
+    read-only assets folder) are ignored, the cache is only an optimization.
+
+    Args:
+        cache_path: Path of the '.npy.lz4' cache file
+        source_stat: os.stat result of the image file
+        img_array: Decoded image to cache
+    """
+    buffer = io.BytesIO()
+    buffer.write(np.array([_CACHE_VERSION, source_stat.st_mtime_ns, source_stat.st_size],
+                          dtype=np.int64).tobytes())
+    np.lib.format.write_array_header_1_0(
+        buffer, np.lib.format.header_data_from_array_1_0(img_array))
+    buffer.write(_byte_shuffle(img_array))
+
+    temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'wb') as cache_file:
+            cache_file.write(lz4.frame.compress(buffer.getvalue()))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def _read_image(image_path: str) -> np.ndarray:
+    """
+    Read an image, using a compressed pixel cache when available.
+
+    With lz4 installed, the decoded pixels are stored next to the image
+    as '<image>.npy.lz4'. Later reads of the same image file (same
+    modification time and size) load the cache instead of decoding the
+    file again.
+
+    Args:
+        image_path: Full path to the image file
+
+    Returns:
+        Numpy array representation of the image
+    """
+    # Don't read a file that is still being written in the background
+    with _pending_lock:
+        pending = _pending_writes.get(image_path)
+    if pending is not None:
+        concurrent.futures.wait([pending])
+
+    if lz4 is None:
+        return _decode_image(image_path)
+
+    cache_path = image_path + '.npy.lz4'
+    source_stat = os.stat(image_path)
+
+    img_array = _load_cache(cache_path, source_stat)
+    if img_array is not None:
+        return img_array
+
+    # Decode the image once and write the cache for next time
+    img_array = _decode_image(image_path)
+    _store_cache(cache_path, source_stat, img_array)
+    return img_array
+
 
 class MyImage(object):
     """
@@ -21,9 +420,11 @@ class MyImage(object):
         Args:
             image_name: Name of the image file (e.g., 'photo.png')
         """
-        self.image_path = self._get_assets_path(image_name)
-        self.img_array = im.v2.imread(self.image_path)
-        self.original_name = image_name
+        # Image artist of the last display_image call, reused while its figure is open
+        self._im_artist = None
+        # Output buffer shared by successive processing calls (see _get_out)
+        self._out_buf = None
+        self.set_image(image_name)
 
     def _get_assets_path(self, filename: str) -> str:
         """
@@ -35,15 +436,25 @@ class MyImage(object):
         Returns:
             Full path to the file in assets folder
         """
-        # Get current directory and go up to find assets folder
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        assets_dir = os.path.join(os.path.dirname(current_dir), 'assets')
+        return os.path.join(_ASSETS_DIR, filename)
+
+    def _get_out(self, shape: tuple, dtype) -> np.ndarray:
+        """
+        Get the output buffer for a processing step, allocating only when needed.
 
-        # Create assets directory if it doesn't exist
-        if not os.path.exists(assets_dir):
-            os.makedirs(assets_dir)
+        The buffer is reused as long as shape and dtype match, so a result
+        that is still needed must be copied before the next processing call.
 
-        return os.path.join(assets_dir, filename)
+        Args:
+            shape: Required shape of the output
+            dtype: Required data type of the output
+
+        Returns:
+            Buffer of the requested shape and dtype (contents undefined)
+        """
+        if self._out_buf is None or self._out_buf.shape != shape or self._out_buf.dtype != dtype:
+            self._out_buf = np.empty(shape, dtype=dtype)
+        return self._out_buf
 
     def set_image(self, image_name: str) -> None:
         """
@@ -53,21 +464,41 @@ class MyImage(object):
             image_name: Name of the new image file
         """
         self.image_path = self._get_assets_path(image_name)
-        self.img_array = im.v2.imread(self.image_path)
+        self.img_array = _read_image(self.image_path)
         self.original_name = image_name
 
+        # Keep the unprocessed pixels around for before/after comparisons.
+        # Processing methods replace img_array rather than modifying it,
+        # so holding a reference is enough.
+        self._original_array = self.img_array
+
     def display_image(self) -> None:
         """Display the current image using matplotlib."""
-        plt.figure(figsize=(8, 6))
-        plt.imshow(self.img_array)
-        plt.title(f'Image: {self.original_name}')
-        plt.axis('off')
+        rgba = _to_rgba(self.img_array)
+
+        # Update the previous figure in place if it is still open
+        artist = self._im_artist
+        if artist is not None and plt.fignum_exists(artist.figure.number) \
+                and artist.get_array().shape == rgba.shape:
+            artist.set_data(rgba)
+            # Rescale the color limits like a fresh imshow (matters for grayscale)
+            artist.autoscale()
+            artist.axes.set_title(f'Image: {self.original_name}')
+            artist.figure.canvas.draw_idle()
+        else:
+            plt.figure(figsize=(8, 6))
+            self._im_artist = plt.imshow(rgba, interpolation='nearest')
+            plt.title(f'Image: {self.original_name}')
+            plt.axis('off')
         plt.show()
 
     def get_image_array(self) -> np.ndarray:
         """
         Get the image as a numpy array.
 
+        After processing, this is a buffer that the next processing call
+        overwrites, use .copy() to keep a result.
+
         Returns:
             Numpy array representation of the image
         """
@@ -81,14 +512,15 @@ class MyImage(object):
             suffix: Suffix to add to filename (e.g., '_processed')
 
         Returns:
-            Path where the image was saved
+            Path where the image will be saved
         """
         name, ext = os.path.splitext(self.original_name)
         new_filename = f"{name}{suffix}{ext}"
         new_path = self._get_assets_path(new_filename)
 
-        im.imwrite(new_path, self.img_array)
-        print(f"Image saved: {new_path}")
+        # Encode and write in the background, the file is complete at exit
+        _submit_write(new_path, self.img_array)
+        print(f"Saving: {new_path}")
         return new_path
 
 
@@ -98,25 +530,36 @@ class ThresholdByNumber(MyImage):
     Pixels below threshold become black, above become white.
     """
 
-    def apply_threshold(self, threshold_value: int) -> None:
+    def apply_threshold(self, threshold_value: int, save: bool = False) -> None:
         """
         Apply threshold filtering to the image.
 
         Args:
             threshold_value: Pixel values below this become 0, above become 255
+            save: Also save the result to the assets folder
         """
-        # Create new array with same shape
-        new_array = np.zeros(self.img_array.shape, dtype=int)
+        # Apply threshold into the reused buffer: 255 (white) or 0 (black)
+        out = self._get_out(self.img_array.shape, np.uint8)
+        _threshold_into(self.img_array, threshold_value, out)
+        self.img_array = out
 
-        # Apply threshold
-        new_array[self.img_array < threshold_value] = 0
-        new_array[self.img_array >= threshold_value] = 255
+        # Save the result if requested
+        if save:
+            self.save_processed_image(f'_threshold_{threshold_value}')
 
-        # Update image array
-        self.img_array = new_array.astype(np.uint8)
+    def apply_thresholds(self, threshold_values) -> np.ndarray:
+        """
+        Apply several thresholds at once, e.g. to compare them visually.
 
-        # Save the result
-        self.save_processed_image(f'_threshold_{threshold_value}')
+        The current image is left unchanged.
+
+        Args:
+            threshold_values: Sequence of threshold values
+
+        Returns:
+            Stack of thresholded images, one per value (0 or 255 per pixel)
+        """
+        return _threshold_stack(self.img_array, threshold_values)
 
 
 class ThresholdByPercentage(MyImage):
@@ -125,28 +568,40 @@ class ThresholdByPercentage(MyImage):
     Good for images with different brightness levels.
     """
 
-    def apply_threshold(self, percentage: int) -> None:
+    def apply_threshold(self, percentage: int, save: bool = False) -> None:
         """
         Apply percentage-based threshold filtering.
 
         Args:
             percentage: Percentage value (0-100) for threshold
+            save: Also save the result to the assets folder
         """
-        # Create new array with same shape
-        new_array = np.zeros(self.img_array.shape, dtype=int)
-
         # Calculate threshold based on percentage
         threshold_value = (percentage / 100) * 255
 
-        # Apply threshold
-        new_array[self.img_array < threshold_value] = 0
-        new_array[self.img_array >= threshold_value] = 255
+        # Apply threshold into the reused buffer: 255 (white) or 0 (black)
+        out = self._get_out(self.img_array.shape, np.uint8)
+        _threshold_into(self.img_array, threshold_value, out)
+        self.img_array = out
 
-        # Update image array
-        self.img_array = new_array.astype(np.uint8)
+        # Save the result if requested
+        if save:
+            self.save_processed_image(f'_threshold_{percentage}percent')
 
-        # Save the result
-        self.save_processed_image(f'_threshold_{percentage}percent')
+    def apply_thresholds(self, percentages) -> np.ndarray:
+        """
+        Apply several percentage thresholds at once, e.g. to compare them visually.
+
+        The current image is left unchanged.
+
+        Args:
+            percentages: Sequence of percentage values (0-100)
+
+        Returns:
+            Stack of thresholded images, one per percentage (0 or 255 per pixel)
+        """
+        threshold_values = np.asarray(percentages, dtype=float) / 100 * 255
+        return _threshold_stack(self.img_array, threshold_values)
 
 
 class RednessDetector(MyImage):
@@ -158,7 +613,7 @@ class RednessDetector(MyImage):
     inflammation in medical images, or other red-dominant areas.
     """
 
-    def detect_red_areas(self, sensitivity: float = 1.2) -> None:
+    def detect_red_areas(self, sensitivity: float = 1.2, device: str = 'cpu') -> None:
         """
         Detect and highlight red areas in the image.
 
@@ -171,37 +626,77 @@ class RednessDetector(MyImage):
                         1.0 = red must be equal to green/blue
                         1.5 = red must be 50% higher than green/blue
                         2.0 = red must be twice as high as green/blue
+            device: Where to run the detection, 'cpu' or 'cuda'
+                    ('cuda' needs PyTorch with a CUDA GPU, otherwise the
+                    CPU is used)
         """
         # Check if image is RGB
         if len(self.img_array.shape) != 3 or self.img_array.shape[2] != 3:
             print("Error: Image must be RGB (3 channels)")
             return
 
-        # Separate RGB channels
-        red_channel = self.img_array[:, :, 0].astype(float)
-        green_channel = self.img_array[:, :, 1].astype(float)
-        blue_channel = self.img_array[:, :, 2].astype(float)
+        if self.img_array.dtype not in (np.uint8, np.uint16):
+            print("Error: Image must have 8-bit or 16-bit channels")
+            return
 
-        # Create mask for red areas
-        # A pixel is considered "red" if red value is higher than green AND blue
-        # multiplied by sensitivity factor
-        red_mask = (red_channel > green_channel * sensitivity) & \
-                   (red_channel > blue_channel * sensitivity)
+        if device not in ('cpu', 'cuda'):
+            print("Error: device must be 'cpu' or 'cuda'")
+            return
 
-        # Create new image: white for red areas, black for everything else
-        new_image = np.zeros_like(self.img_array)
-        new_image[red_mask] = [255, 255, 255]  # White for red areas
-        new_image[~red_mask] = [0, 0, 0]  # Black for non-red areas
+        # Sensitivity in fixed point, so the test stays in integer arithmetic
+        scale = _sensitivity_scale(sensitivity, np.iinfo(self.img_array.dtype).max)
+
+        new_image = None
+        if device == 'cuda':
+            # GPU: the whole test runs as elementwise tensor ops on the device
+            new_image = _red_mask_torch(self.img_array, scale, device)
+            if new_image is None:
+                print("Warning: PyTorch with CUDA is not available, using the CPU")
+
+        if new_image is None and _red_mask_kernel is not None:
+            # Compiled kernel: one pass over the pixels, no temporaries
+            new_image = self._get_out(self.img_array.shape, np.uint8)
+            _red_mask_kernel(self.img_array, scale, new_image)
+        elif new_image is None and red_mask_u8 is not None and self.img_array.dtype == np.uint8:
+            # Precompiled kernel (no Numba installed): same sweep, single-threaded
+            new_image = self._get_out(self.img_array.shape, np.uint8)
+            red_mask_u8(np.ascontiguousarray(self.img_array), scale, new_image)
+        elif new_image is None:
+            # Work through horizontal bands so the temporaries stay in cache
+            # instead of streaming the whole image through memory several times
+            height, width = self.img_array.shape[:2]
+            tile_rows = max(1, _TILE_PIXELS // width)
+            work_dtype = _red_work_dtype(self.img_array.dtype)
+            new_image = self._get_out(self.img_array.shape, np.uint8)
+
+            for y in range(0, height, tile_rows):
+                tile = self.img_array[y:y + tile_rows]
+
+                # Separate RGB channels, wide enough for channel * scale
+                red_channel = tile[:, :, 0].astype(work_dtype)
+                green_channel = tile[:, :, 1].astype(work_dtype)
+                blue_channel = tile[:, :, 2].astype(work_dtype)
+
+                # Create mask for red areas
+                # A pixel is considered "red" if red value is higher than green AND blue
+                # multiplied by sensitivity factor
+                red_channel *= 256
+                red_mask = (red_channel > green_channel * scale) & \
+                           (red_channel > blue_channel * scale)
+
+                # White for red areas, black for everything else
+                # (the mask broadcast across the 3 channels)
+                np.multiply(red_mask[..., None], np.uint8(255), out=new_image[y:y + tile_rows])
 
         # Update image array
-        self.img_array = new_image.astype(np.uint8)
+        self.img_array = new_image
 
         # Save the result
         self.save_processed_image(f'_red_detection_sens_{sensitivity}')
 
         # Print statistics
-        red_pixel_count = np.sum(red_mask)
-        total_pixels = red_mask.size
+        red_pixel_count = np.count_nonzero(self.img_array[:, :, 0])
+        total_pixels = self.img_array.shape[0] * self.img_array.shape[1]
         red_percentage = (red_pixel_count / total_pixels) * 100
         print(f"Red pixels detected: {red_pixel_count} ({red_percentage:.1f}%)")
 
@@ -210,21 +705,21 @@ class RednessDetector(MyImage):
         Display original image alongside the processed result.
         Useful for comparing the detection results.
         """
-        # Load original image
-        original = im.v2.imread(self.image_path)
+        # Original image as loaded, no need to decode it again
+        original = self._original_array
 
         # Create side-by-side comparison
         plt.figure(figsize=(15, 6))
 
         # Original image
         plt.subplot(1, 2, 1)
-        plt.imshow(original)
+        plt.imshow(_to_rgba(original), interpolation='nearest')
         plt.title('Original Image')
         plt.axis('off')
 
         # Processed image
         plt.subplot(1, 2, 2)
-        plt.imshow(self.img_array)
+        plt.imshow(_to_rgba(self.img_array), interpolation='nearest')
         plt.title('Red Areas Detection')
         plt.axis('off')
 
@@ -242,7 +737,7 @@ def create_test_image_with_red_dots():
 
     # Create 400x400 image with light gray background
     height, width = 400, 400
-    image = np.ones((height, width, 3), dtype=np.uint8) * 200
+    image = np.full((height, width, 3), 200, dtype=np.uint8)
 
     # Add random red dots
     num_red_dots = 25
@@ -255,22 +750,21 @@ def create_test_image_with_red_dots():
         # Random size
         size = random.randint(5, 20)
 
-        # Create circular red dot
-        for i in range(-size, size + 1):
-            for j in range(-size, size + 1):
-                if i * i + j * j <= size * size:  # Circle equation
-                    if 0 <= y + i < height and 0 <= x + j < width:
-                        image[y + i, x + j] = [255, 0, 0]  # Pure red
+        # Create circular red dot as a boolean disk mask
+        yy, xx = np.ogrid[-size:size + 1, -size:size + 1]
+        disk = xx * xx + yy * yy <= size * size  # Circle equation
 
-    # Save test image to assets folder
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    assets_dir = os.path.join(os.path.dirname(current_dir), 'assets')
+        # Clip the dot to the image borders
+        y0, y1 = max(0, y - size), min(height, y + size + 1)
+        x0, x1 = max(0, x - size), min(width, x + size + 1)
+        disk = disk[y0 - (y - size):y1 - (y - size),
+                    x0 - (x - size):x1 - (x - size)]
 
-    if not os.path.exists(assets_dir):
-        os.makedirs(assets_dir)
+        image[y0:y1, x0:x1][disk] = [255, 0, 0]  # Pure red
 
-    test_image_path = os.path.join(assets_dir, 'test_red_dots.png')
-    im.imwrite(test_image_path, image)
+    # Save test image to assets folder
+    test_image_path = os.path.join(_ASSETS_DIR, 'test_red_dots.png')
+    iio.imwrite(test_image_path, image, plugin="opencv")
     print(f"Test image created: {test_image_path}")
 
     return 'test_red_dots.png'